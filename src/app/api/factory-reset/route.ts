@@ -1,4 +1,5 @@
 import { getDataDirectory } from "@/lib/config-loader";
+import { clearJudgeCache } from "@/lib/metrics";
 import fs from "fs/promises";
 import { NextResponse } from "next/server";
 import path from "path";
@@ -40,6 +41,9 @@ export async function POST() {
       "utf-8"
     );
 
+    // Drop cached judge results
+    await clearJudgeCache();
+
     // Note: Prompt and schema are now defined in dspyground.config.ts
     // and cannot be reset through the UI
 
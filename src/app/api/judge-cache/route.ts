@@ -0,0 +1,16 @@
+import { clearJudgeCache } from "@/lib/metrics";
+import { NextResponse } from "next/server";
+
+// DELETE /api/judge-cache - Drop cached judge results
+export async function DELETE() {
+  try {
+    await clearJudgeCache();
+    return NextResponse.json({ success: true });
+  } catch (error) {
+    console.error("Error clearing judge cache:", error);
+    return NextResponse.json(
+      { error: "Failed to clear judge cache" },
+      { status: 500 }
+    );
+  }
+}
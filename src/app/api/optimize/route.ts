@@ -1,11 +1,16 @@
 /* eslint-disable @typescript-eslint/no-explicit-any */
+import {
+  limitModelCall,
+  mapWithConcurrency,
+  OPTIMIZE_CONCURRENCY,
+} from "@/lib/concurrency";
 import { getDataDirectory, loadUserConfig } from "@/lib/config-loader";
 import { generateObject, generateText } from "ai";
 import { promises as fs } from "fs";
 import { nanoid } from "nanoid";
 import * as path from "path";
-import type { Trajectory } from "../../../lib/metrics";
-import { judgeAndScoreSample } from "../../../lib/metrics";
+import type { JudgeResult, Trajectory } from "../../../lib/metrics";
+import { JUDGE_BATCH_SIZE, judgeAndScoreBatch } from "../../../lib/metrics";
 import type {
   MetricScores,
   MetricType,
@@ -26,13 +31,28 @@ interface OptimizeRequest {
   sampleGroupId?: string;
 }
 
+// Parsed samples.json, reused until the file's mtime changes
+let samplesFileCache: { path: string; mtimeMs: number; parsed: any } | null =
+  null;
+
 // Helper to load samples from .dspyground/data/samples.json
 async function loadSamples(groupId?: string): Promise<Sample[]> {
   const dataDir = getDataDirectory();
   const samplesPath = path.join(dataDir, "samples.json");
   try {
-    const data = await fs.readFile(samplesPath, "utf-8");
-    const parsed = JSON.parse(data);
+    const { mtimeMs } = await fs.stat(samplesPath);
+    let parsed;
+    if (
+      samplesFileCache &&
+      samplesFileCache.path === samplesPath &&
+      samplesFileCache.mtimeMs === mtimeMs
+    ) {
+      parsed = samplesFileCache.parsed;
+    } else {
+      const data = await fs.readFile(samplesPath, "utf-8");
+      parsed = JSON.parse(data);
+      samplesFileCache = { path: samplesPath, mtimeMs, parsed };
+    }
 
     // Handle new groups structure
     if (parsed.groups && Array.isArray(parsed.groups)) {
@@ -60,6 +80,43 @@ async function loadSchema(): Promise<any> {
   return config.schema || null;
 }
 
+// Model inputs derived from a sample. Samples are evaluated many times per
+// run (and reused across runs while samples.json is unchanged), so this is
+// computed once per sample object.
+interface PreparedSample {
+  userInput: string;
+  stringMessages: Array<{ role: string; content: string }>;
+}
+
+const preparedSamples = new WeakMap<Sample, PreparedSample>();
+
+function prepareSample(sample: Sample): PreparedSample {
+  let prepared = preparedSamples.get(sample);
+  if (!prepared) {
+    const userMessage = sample.messages.find((m) => m.role === "user");
+    const userInput =
+      typeof userMessage?.content === "string"
+        ? userMessage.content
+        : userMessage?.content?.[0]?.text || "";
+
+    // Convert message content to string format
+    const stringMessages = sample.messages.map((msg) => {
+      let content = msg.content;
+      if (typeof content !== "string") {
+        // Convert complex content to string
+        content = Array.isArray(content)
+          ? content.map((c) => c.text || JSON.stringify(c)).join(" ")
+          : JSON.stringify(content);
+      }
+      return { role: msg.role, content };
+    });
+
+    prepared = { userInput, stringMessages };
+    preparedSamples.set(sample, prepared);
+  }
+  return prepared;
+}
+
 // Generate a trajectory for a sample using the current prompt
 async function generateTrajectoryForSample(
   sample: Sample,
@@ -70,11 +127,7 @@ async function generateTrajectoryForSample(
   sendProgress?: (data: any) => Promise<void>,
   iteration?: number
 ): Promise<Trajectory> {
-  const userMessage = sample.messages.find((m) => m.role === "user");
-  const userInput =
-    typeof userMessage?.content === "string"
-      ? userMessage.content
-      : userMessage?.content?.[0]?.text || "";
+  const { userInput, stringMessages } = prepareSample(sample);
 
   let predictedMessages: Trajectory["messages"] = [];
 
@@ -94,24 +147,14 @@ async function generateTrajectoryForSample(
       }
 
       // Use generateObject for structured output (non-streaming for optimizer)
-      // Convert message content to string format
-      const messages: any[] = sample.messages.map((msg) => {
-        let content = msg.content;
-        if (typeof content !== "string") {
-          // Convert complex content to string
-          content = Array.isArray(content)
-            ? content.map((c) => c.text || JSON.stringify(c)).join(" ")
-            : JSON.stringify(content);
-        }
-        return { role: msg.role, content };
-      });
-
-      const { object: result } = await generateObject({
-        model,
-        system: prompt,
-        messages: messages as any,
-        schema: schema,
-      });
+      const { object: result } = await limitModelCall(() =>
+        generateObject({
+          model,
+          system: prompt,
+          messages: stringMessages as any,
+          schema: schema,
+        })
+      );
 
       const outputStr = JSON.stringify(result, null, 2);
 
@@ -148,12 +191,14 @@ async function generateTrajectoryForSample(
       }
 
       const config = await loadUserConfig();
-      const result = await generateText({
-        model,
-        system: prompt,
-        prompt: userInput,
-        tools: config.tools || {},
-      });
+      const result = await limitModelCall(() =>
+        generateText({
+          model,
+          system: prompt,
+          prompt: userInput,
+          tools: config.tools || {},
+        })
+      );
 
       // Send final text result
       if (sendProgress && iteration !== undefined) {
@@ -178,7 +223,8 @@ async function generateTrajectoryForSample(
               type: "tool-call" as const,
               toolCallId: tc.toolCallId,
               toolName: tc.toolName,
-              args: tc.args,
+              // AI SDK 5 exposes tool call arguments as `input`
+              args: tc.input,
             })),
           });
 
@@ -191,7 +237,8 @@ async function generateTrajectoryForSample(
                     type: "tool-result" as const,
                     toolCallId: tr.toolCallId,
                     toolName: tr.toolName,
-                    result: (tr as any).result,
+                    // AI SDK 5 exposes tool results as `output`
+                    result: tr.output,
                     isError: false,
                   },
                 ],
@@ -230,65 +277,6 @@ async function generateTrajectoryForSample(
   };
 }
 
-// Wrapper to evaluate a sample with the current prompt
-async function evaluateSampleWithPrompt(
-  sample: Sample,
-  currentPrompt: string,
-  model: string,
-  reflectionModel: string,
-  selectedMetrics: string[],
-  useStructuredOutput: boolean,
-  schema?: any,
-  sendProgress?: (data: any) => Promise<void>,
-  iteration?: number
-): Promise<{
-  metrics: MetricScores;
-  overallScore: number;
-  detailedFeedback: string;
-  suggestedImprovements: string;
-}> {
-  console.log(`[Judge] Evaluating sample ${sample.id}...`);
-
-  // Generate trajectory using current prompt with streaming
-  const generatedTrajectory = await generateTrajectoryForSample(
-    sample,
-    currentPrompt,
-    model,
-    useStructuredOutput,
-    schema,
-    sendProgress,
-    iteration
-  );
-
-  // Use the imported judgeAndScoreSample function from metrics.ts
-  const result = await judgeAndScoreSample(
-    sample,
-    generatedTrajectory,
-    reflectionModel,
-    selectedMetrics
-  );
-
-  // Stream the evaluation result
-  if (sendProgress && iteration !== undefined) {
-    await sendProgress({
-      type: "evaluation_output",
-      iteration,
-      content: `Sample ${sample.id}: Score ${result.overallScore.toFixed(2)}\n${
-        result.detailedFeedback
-      }`,
-      accepted: false,
-      collectionSize: 0,
-      bestScore: 0,
-    });
-  }
-
-  console.log(
-    `[Judge] Sample ${sample.id} - Overall: ${result.overallScore.toFixed(2)}`
-  );
-
-  return result;
-}
-
 // Evaluate a batch of samples
 async function evaluateBatch(
   samples: Sample[],
@@ -318,23 +306,77 @@ async function evaluateBatch(
     };
   }
 
-  // Evaluate samples sequentially to stream properly (not in parallel)
-  const results = [];
-  for (const s of samples) {
-    const result = await evaluateSampleWithPrompt(
-      s,
-      prompt,
-      model,
-      reflectionModel,
-      selectedMetrics,
-      useStructuredOutput,
-      schema,
-      sendProgress,
-      iteration
-    );
-    results.push(result);
+  // Generate trajectories concurrently; progress events carry the sample ID
+  const generatedTrajectories = await mapWithConcurrency(
+    samples,
+    OPTIMIZE_CONCURRENCY,
+    (s) =>
+      generateTrajectoryForSample(
+        s,
+        prompt,
+        model,
+        useStructuredOutput,
+        schema,
+        sendProgress,
+        iteration
+      )
+  );
+
+  // Judge in chunks so several pairs share a single reflection model call,
+  // with the chunks themselves running concurrently
+  const chunks: Sample[][] = [];
+  for (let i = 0; i < samples.length; i += JUDGE_BATCH_SIZE) {
+    chunks.push(samples.slice(i, i + JUDGE_BATCH_SIZE));
   }
 
+  const chunkResults = await mapWithConcurrency(
+    chunks,
+    OPTIMIZE_CONCURRENCY,
+    async (chunk, chunkIndex) => {
+      console.log(
+        `[Judge] Evaluating samples ${chunk.map((s) => s.id).join(", ")}...`
+      );
+
+      const offset = chunkIndex * JUDGE_BATCH_SIZE;
+      const judged = await judgeAndScoreBatch(
+        chunk.map((sample, j) => ({
+          sample,
+          generatedTrajectory: generatedTrajectories[offset + j],
+        })),
+        reflectionModel,
+        selectedMetrics
+      );
+
+      for (let j = 0; j < chunk.length; j++) {
+        const sample = chunk[j];
+        const result = judged[j];
+
+        // Stream the evaluation result
+        if (sendProgress && iteration !== undefined) {
+          await sendProgress({
+            type: "evaluation_output",
+            iteration,
+            content: `Sample ${sample.id}: Score ${result.overallScore.toFixed(
+              2
+            )}\n${result.detailedFeedback}`,
+            accepted: false,
+            collectionSize: 0,
+            bestScore: 0,
+          });
+        }
+
+        console.log(
+          `[Judge] Sample ${sample.id} - Overall: ${result.overallScore.toFixed(
+            2
+          )}`
+        );
+      }
+
+      return judged;
+    }
+  );
+  const results: JudgeResult[] = chunkResults.flat();
+
   // Aggregate metrics
   const aggregatedMetrics: MetricScores = {};
   for (const metric of selectedMetrics) {
@@ -397,10 +439,12 @@ Analyze all the feedback and suggestions above. Then write an IMPROVED version o
 Return ONLY the improved prompt text, nothing else.`;
 
   try {
-    const result = await generateText({
-      model: reflectionModel,
-      prompt: improvementPrompt,
-    });
+    const result = await limitModelCall(() =>
+      generateText({
+        model: reflectionModel,
+        prompt: improvementPrompt,
+      })
+    );
 
     const improvedPrompt = result.text.trim();
     console.log(
@@ -469,35 +513,85 @@ function selectPrompt(collection: PromptCandidate[]): PromptCandidate {
   );
 }
 
-// Save run data to runs.json
-async function saveRun(run: OptimizationRun): Promise<void> {
+// Last runs.json contents written by this process. Reused on the next save
+// unless the file was modified elsewhere (e.g. a run deleted via /api/runs).
+let runsFileCache: {
+  path: string;
+  mtimeMs: number;
+  data: { runs: OptimizationRun[] };
+} | null = null;
+
+async function readRunsFile(
+  runsPath: string
+): Promise<{ runs: OptimizationRun[] }> {
   try {
-    const dataDir = getDataDirectory();
-    const runsPath = path.join(dataDir, "runs.json");
-    let data: { runs: OptimizationRun[] } = { runs: [] };
-
-    try {
-      const fileContent = await fs.readFile(runsPath, "utf-8");
-      data = JSON.parse(fileContent);
-    } catch {
-      // File doesn't exist yet, use default
+    const { mtimeMs } = await fs.stat(runsPath);
+    if (
+      runsFileCache &&
+      runsFileCache.path === runsPath &&
+      runsFileCache.mtimeMs === mtimeMs
+    ) {
+      return runsFileCache.data;
     }
 
-    // Find and update existing run or add new one
-    const existingIndex = data.runs.findIndex((r) => r.id === run.id);
-    if (existingIndex >= 0) {
-      data.runs[existingIndex] = run;
-    } else {
-      data.runs.push(run);
+    const fileContent = await fs.readFile(runsPath, "utf-8");
+    return JSON.parse(fileContent);
+  } catch {
+    // File doesn't exist yet, use default
+    return { runs: [] };
+  }
+}
+
+// Write run snapshots to runs.json in a single read-modify-write
+async function writeRuns(runs: OptimizationRun[]): Promise<void> {
+  try {
+    const dataDir = getDataDirectory();
+    const runsPath = path.join(dataDir, "runs.json");
+    const data = await readRunsFile(runsPath);
+
+    for (const run of runs) {
+      // Find and update existing run or add new one
+      const existingIndex = data.runs.findIndex((r) => r.id === run.id);
+      if (existingIndex >= 0) {
+        data.runs[existingIndex] = run;
+      } else {
+        data.runs.push(run);
+      }
     }
 
     await fs.writeFile(runsPath, JSON.stringify(data, null, 2));
-    console.log(`[Save Run] Saved run ${run.id}`);
+    const { mtimeMs } = await fs.stat(runsPath);
+    runsFileCache = { path: runsPath, mtimeMs, data };
+    console.log(`[Save Run] Saved run ${runs.map((r) => r.id).join(", ")}`);
   } catch (error) {
     console.error("[Save Run] Error saving run:", error);
   }
 }
 
+// Runs waiting to be written. Saves are coalesced by a single writer so the
+// optimization loop never waits on disk and concurrent runs don't race on
+// runs.json; only the latest state of each run is written.
+const pendingRuns = new Map<string, OptimizationRun>();
+let runsFlush: Promise<void> | null = null;
+
+async function flushPendingRuns(): Promise<void> {
+  while (pendingRuns.size > 0) {
+    const runs = [...pendingRuns.values()];
+    pendingRuns.clear();
+    await writeRuns(runs);
+  }
+  runsFlush = null;
+}
+
+// Save run data to runs.json; resolves once the run has been written
+function saveRun(run: OptimizationRun): Promise<void> {
+  pendingRuns.set(run.id, run);
+  if (!runsFlush) {
+    runsFlush = flushPendingRuns();
+  }
+  return runsFlush;
+}
+
 // Main GEPA optimization loop
 async function runGEPA(
   config: OptimizeRequest,
@@ -572,255 +666,264 @@ async function runGEPA(
   await saveRun(run);
   console.log(`[GEPA] Run ${runId} saved to runs.json`);
 
-  await sendProgress({
-    type: "start",
-    iteration: 0,
-    message: `Starting GEPA optimization with ${allSamples.length} samples, ${config.numRollouts} iterations (Run ID: ${runId})`,
-    collectionSize: 1,
-    bestScore: 0,
-    accepted: false,
-  });
-
-  // Initialize collection with seed prompt
-  console.log("[GEPA] Evaluating seed prompt...");
-  const initialBatch = [];
-  for (let i = 0; i < config.batchSize; i++) {
-    const randomIndex = Math.floor(Math.random() * allSamples.length);
-    const sample = allSamples[randomIndex];
-    initialBatch.push(sample);
-    if (!samplesUsed.includes(sample.id)) {
-      samplesUsed.push(sample.id);
-    }
-  }
-
-  const initialEval = await evaluateBatch(
-    initialBatch,
-    seedPrompt,
-    config.optimizationModel,
-    config.reflectionModel,
-    config.selectedMetrics,
-    config.useStructuredOutput || false,
-    schema,
-    sendProgress,
-    0
-  );
-
-  const collection: PromptCandidate[] = [
-    {
-      id: "seed",
-      prompt: seedPrompt,
-      metrics: initialEval.metrics,
-      overallScore: initialEval.overallScore,
-      bestForExamples: [],
-    },
-  ];
-
-  let bestScore = initialEval.overallScore;
-
-  // Save seed prompt to run
-  runPrompts.push({
-    iteration: 0,
-    prompt: seedPrompt,
-    accepted: true,
-    score: initialEval.overallScore,
-    metrics: initialEval.metrics,
-  });
-
-  console.log(`[GEPA] Seed prompt score: ${bestScore.toFixed(2)}`);
-
-  // Main GEPA loop
-  for (let iteration = 1; iteration <= config.numRollouts; iteration++) {
-    console.log(
-      `\n[GEPA] === Iteration ${iteration}/${config.numRollouts} ===`
-    );
-
-    // Select prompt from collection
-    const selectedCandidate = selectPrompt(collection);
-    console.log(
-      `[GEPA] Selected candidate: ${
-        selectedCandidate.id
-      } (score: ${selectedCandidate.overallScore.toFixed(2)})`
-    );
+  try {
+    await sendProgress({
+      type: "start",
+      iteration: 0,
+      message: `Starting GEPA optimization with ${allSamples.length} samples, ${config.numRollouts} iterations (Run ID: ${runId})`,
+      collectionSize: 1,
+      bestScore: 0,
+      accepted: false,
+    });
 
-    // Random batch sampling with replacement
-    const batch: Sample[] = [];
+    // Initialize collection with seed prompt
+    console.log("[GEPA] Evaluating seed prompt...");
+    const initialBatch = [];
     for (let i = 0; i < config.batchSize; i++) {
       const randomIndex = Math.floor(Math.random() * allSamples.length);
       const sample = allSamples[randomIndex];
-      batch.push(sample);
+      initialBatch.push(sample);
       if (!samplesUsed.includes(sample.id)) {
         samplesUsed.push(sample.id);
       }
     }
 
-    console.log(
-      `[GEPA] Sampled batch of ${batch.length} (IDs: ${batch
-        .map((s) => s.id.substring(0, 8))
-        .join(", ")})`
-    );
-
-    // Evaluate current prompt on batch
-    const batchEval = await evaluateBatch(
-      batch,
-      selectedCandidate.prompt,
+    const initialEval = await evaluateBatch(
+      initialBatch,
+      seedPrompt,
       config.optimizationModel,
       config.reflectionModel,
       config.selectedMetrics,
       config.useStructuredOutput || false,
       schema,
       sendProgress,
-      iteration
+      0
     );
 
-    console.log(
-      `[GEPA] Current prompt batch score: ${batchEval.overallScore.toFixed(2)}`
-    );
+    const collection: PromptCandidate[] = [
+      {
+        id: "seed",
+        prompt: seedPrompt,
+        metrics: initialEval.metrics,
+        overallScore: initialEval.overallScore,
+        bestForExamples: [],
+      },
+    ];
 
-    // Improve prompt based on evaluation
-    const improvedPrompt = await improvePrompt(
-      selectedCandidate.prompt,
-      batchEval.suggestions,
-      batchEval.feedbacks,
-      config.reflectionModel
-    );
+    let bestScore = initialEval.overallScore;
 
-    // Test improved prompt on same batch
-    const improvedEval = await evaluateBatch(
-      batch,
-      improvedPrompt,
-      config.optimizationModel,
-      config.reflectionModel,
-      config.selectedMetrics,
-      config.useStructuredOutput || false,
-      schema,
-      sendProgress,
-      iteration
-    );
+    // Save seed prompt to run
+    runPrompts.push({
+      iteration: 0,
+      prompt: seedPrompt,
+      accepted: true,
+      score: initialEval.overallScore,
+      metrics: initialEval.metrics,
+    });
 
-    console.log(
-      `[GEPA] Improved prompt batch score: ${improvedEval.overallScore.toFixed(
-        2
-      )}`
-    );
+    console.log(`[GEPA] Seed prompt score: ${bestScore.toFixed(2)}`);
 
-    // Accept if better
-    if (improvedEval.overallScore > batchEval.overallScore) {
-      const newCandidate: PromptCandidate = {
-        id: `candidate-${iteration}`,
-        prompt: improvedPrompt,
-        metrics: improvedEval.metrics,
-        overallScore: improvedEval.overallScore,
-        bestForExamples: [],
-      };
+    // Main GEPA loop
+    for (let iteration = 1; iteration <= config.numRollouts; iteration++) {
+      console.log(
+        `\n[GEPA] === Iteration ${iteration}/${config.numRollouts} ===`
+      );
 
-      // Update Pareto frontier
-      const updatedCollection = updateParetoFrontier(
-        collection,
-        newCandidate,
-        config.selectedMetrics
+      // Select prompt from collection
+      const selectedCandidate = selectPrompt(collection);
+      console.log(
+        `[GEPA] Selected candidate: ${
+          selectedCandidate.id
+        } (score: ${selectedCandidate.overallScore.toFixed(2)})`
       );
-      collection.length = 0;
-      collection.push(...updatedCollection);
 
-      if (improvedEval.overallScore > bestScore) {
-        bestScore = improvedEval.overallScore;
+      // Random batch sampling with replacement
+      const batch: Sample[] = [];
+      for (let i = 0; i < config.batchSize; i++) {
+        const randomIndex = Math.floor(Math.random() * allSamples.length);
+        const sample = allSamples[randomIndex];
+        batch.push(sample);
+        if (!samplesUsed.includes(sample.id)) {
+          samplesUsed.push(sample.id);
+        }
       }
 
-      // Save accepted prompt to run
-      runPrompts.push({
-        iteration,
-        prompt: improvedPrompt,
-        accepted: true,
-        score: improvedEval.overallScore,
-        metrics: improvedEval.metrics,
-      });
+      console.log(
+        `[GEPA] Sampled batch of ${batch.length} (IDs: ${batch
+          .map((s) => s.id.substring(0, 8))
+          .join(", ")})`
+      );
+
+      // Evaluate current prompt on batch
+      const batchEval = await evaluateBatch(
+        batch,
+        selectedCandidate.prompt,
+        config.optimizationModel,
+        config.reflectionModel,
+        config.selectedMetrics,
+        config.useStructuredOutput || false,
+        schema,
+        sendProgress,
+        iteration
+      );
 
       console.log(
-        `[GEPA] ✓ Accepted! Collection size: ${
-          collection.length
-        }, Best score: ${bestScore.toFixed(2)}`
+        `[GEPA] Current prompt batch score: ${batchEval.overallScore.toFixed(2)}`
       );
 
-      await sendProgress({
-        type: "iteration",
-        iteration,
-        candidatePrompt: improvedPrompt,
-        batchScore: improvedEval.overallScore,
-        accepted: true,
-        collectionSize: collection.length,
-        bestScore,
-        metrics: improvedEval.metrics,
-        message: `Iteration ${iteration}: Improved! Score ${batchEval.overallScore.toFixed(
-          2
-        )} → ${improvedEval.overallScore.toFixed(2)}`,
-      });
-    } else {
-      // Save rejected prompt to run
-      runPrompts.push({
-        iteration,
-        prompt: improvedPrompt,
-        accepted: false,
-        score: improvedEval.overallScore,
-        metrics: improvedEval.metrics,
-      });
+      // Improve prompt based on evaluation
+      const improvedPrompt = await improvePrompt(
+        selectedCandidate.prompt,
+        batchEval.suggestions,
+        batchEval.feedbacks,
+        config.reflectionModel
+      );
+
+      // Test improved prompt on same batch
+      const improvedEval = await evaluateBatch(
+        batch,
+        improvedPrompt,
+        config.optimizationModel,
+        config.reflectionModel,
+        config.selectedMetrics,
+        config.useStructuredOutput || false,
+        schema,
+        sendProgress,
+        iteration
+      );
 
       console.log(
-        `[GEPA] ✗ Rejected (no improvement: ${batchEval.overallScore.toFixed(
+        `[GEPA] Improved prompt batch score: ${improvedEval.overallScore.toFixed(
           2
-        )} vs ${improvedEval.overallScore.toFixed(2)})`
+        )}`
       );
 
-      await sendProgress({
-        type: "iteration",
-        iteration,
-        batchScore: batchEval.overallScore,
-        accepted: false,
-        collectionSize: collection.length,
-        bestScore,
-        message: `Iteration ${iteration}: No improvement`,
-      });
+      // Accept if better
+      if (improvedEval.overallScore > batchEval.overallScore) {
+        const newCandidate: PromptCandidate = {
+          id: `candidate-${iteration}`,
+          prompt: improvedPrompt,
+          metrics: improvedEval.metrics,
+          overallScore: improvedEval.overallScore,
+          bestForExamples: [],
+        };
+
+        // Update Pareto frontier
+        const updatedCollection = updateParetoFrontier(
+          collection,
+          newCandidate,
+          config.selectedMetrics
+        );
+        collection.length = 0;
+        collection.push(...updatedCollection);
+
+        if (improvedEval.overallScore > bestScore) {
+          bestScore = improvedEval.overallScore;
+        }
+
+        // Save accepted prompt to run
+        runPrompts.push({
+          iteration,
+          prompt: improvedPrompt,
+          accepted: true,
+          score: improvedEval.overallScore,
+          metrics: improvedEval.metrics,
+        });
+
+        console.log(
+          `[GEPA] ✓ Accepted! Collection size: ${
+            collection.length
+          }, Best score: ${bestScore.toFixed(2)}`
+        );
+
+        await sendProgress({
+          type: "iteration",
+          iteration,
+          candidatePrompt: improvedPrompt,
+          batchScore: improvedEval.overallScore,
+          accepted: true,
+          collectionSize: collection.length,
+          bestScore,
+          metrics: improvedEval.metrics,
+          message: `Iteration ${iteration}: Improved! Score ${batchEval.overallScore.toFixed(
+            2
+          )} → ${improvedEval.overallScore.toFixed(2)}`,
+        });
+      } else {
+        // Save rejected prompt to run
+        runPrompts.push({
+          iteration,
+          prompt: improvedPrompt,
+          accepted: false,
+          score: improvedEval.overallScore,
+          metrics: improvedEval.metrics,
+        });
+
+        console.log(
+          `[GEPA] ✗ Rejected (no improvement: ${batchEval.overallScore.toFixed(
+            2
+          )} vs ${improvedEval.overallScore.toFixed(2)})`
+        );
+
+        await sendProgress({
+          type: "iteration",
+          iteration,
+          batchScore: batchEval.overallScore,
+          accepted: false,
+          collectionSize: collection.length,
+          bestScore,
+          message: `Iteration ${iteration}: No improvement`,
+        });
+      }
+
+      // Update and save run data periodically
+      run.prompts = runPrompts;
+      run.bestScore = bestScore;
+      run.samplesUsed = samplesUsed;
+      run.collectionSize = collection.length;
+      run.finalPrompt = selectPrompt(collection).prompt;
+      void saveRun(run);
     }
 
-    // Update and save run data periodically
-    run.prompts = runPrompts;
+    // Final result
+    const bestCandidate = selectPrompt(collection);
+
+    console.log("\n[GEPA] === Optimization Complete ===");
+    console.log(`[GEPA] Best score: ${bestScore.toFixed(2)}`);
+    console.log(`[GEPA] Collection size: ${collection.length}`);
+    console.log(
+      `[GEPA] Best prompt: "${bestCandidate.prompt.substring(0, 100)}..."`
+    );
+
+    // Save final run data
+    run.status = "completed";
+    run.finalPrompt = bestCandidate.prompt;
     run.bestScore = bestScore;
+    run.prompts = runPrompts;
     run.samplesUsed = samplesUsed;
     run.collectionSize = collection.length;
-    run.finalPrompt = selectPrompt(collection).prompt;
     await saveRun(run);
-  }
-
-  // Final result
-  const bestCandidate = selectPrompt(collection);
-
-  console.log("\n[GEPA] === Optimization Complete ===");
-  console.log(`[GEPA] Best score: ${bestScore.toFixed(2)}`);
-  console.log(`[GEPA] Collection size: ${collection.length}`);
-  console.log(
-    `[GEPA] Best prompt: "${bestCandidate.prompt.substring(0, 100)}..."`
-  );
 
-  // Save final run data
-  run.status = "completed";
-  run.finalPrompt = bestCandidate.prompt;
-  run.bestScore = bestScore;
-  run.prompts = runPrompts;
-  run.samplesUsed = samplesUsed;
-  run.collectionSize = collection.length;
-  await saveRun(run);
-
-  await sendProgress({
-    type: "complete",
-    iteration: config.numRollouts,
-    finalPrompt: bestCandidate.prompt,
-    bestScore,
-    collectionSize: collection.length,
-    collection,
-    accepted: true,
-    message: `Optimization complete! Final score: ${bestScore.toFixed(
-      2
-    )} (Run ID: ${runId})`,
-  });
+    await sendProgress({
+      type: "complete",
+      iteration: config.numRollouts,
+      finalPrompt: bestCandidate.prompt,
+      bestScore,
+      collectionSize: collection.length,
+      collection,
+      accepted: true,
+      message: `Optimization complete! Final score: ${bestScore.toFixed(
+        2
+      )} (Run ID: ${runId})`,
+    });
+  } catch (error) {
+    // Mark this run as failed through the same writer as every other save
+    if (run.status === "running") {
+      run.status = "error";
+      await saveRun(run);
+    }
+    throw error;
+  }
 }
 
 // API Route Handler
@@ -839,21 +942,6 @@ export async function POST(request: Request) {
       } catch (error) {
         console.error("[GEPA] Fatal error:", error);
 
-        // Try to save error status to run
-        try {
-          const dataDir = getDataDirectory();
-          const runsPath = path.join(dataDir, "runs.json");
-          const data = await fs.readFile(runsPath, "utf-8");
-          const runsData = JSON.parse(data);
-          const lastRun = runsData.runs[runsData.runs.length - 1];
-          if (lastRun && lastRun.status === "running") {
-            lastRun.status = "error";
-            await fs.writeFile(runsPath, JSON.stringify(runsData, null, 2));
-          }
-        } catch {
-          // Ignore errors in error handling
-        }
-
         await sendProgress({
           type: "error",
           error:
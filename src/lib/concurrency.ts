@@ -0,0 +1,98 @@
+// Maximum number of in-flight model calls during optimization
+export const OPTIMIZE_CONCURRENCY = Math.max(
+  1,
+  Math.floor(Number(process.env.OPTIMIZE_CONCURRENCY)) || 48
+);
+
+/**
+ * Limit how many tasks run at once. Tasks beyond the limit wait in arrival
+ * order until a running task finishes.
+ */
+export function createConcurrencyLimiter(
+  limit: number
+): <T>(task: () => Promise<T>) => Promise<T> {
+  const maxActive = Math.max(1, limit);
+  let active = 0;
+  const waiting: Array<() => void> = [];
+
+  return async (task) => {
+    if (active < maxActive) {
+      active++;
+    } else {
+      // The finishing task hands its slot over directly
+      await new Promise<void>((resolve) => waiting.push(resolve));
+    }
+
+    try {
+      return await task();
+    } finally {
+      const next = waiting.shift();
+      if (next) {
+        next();
+      } else {
+        active--;
+      }
+    }
+  };
+}
+
+// Shared by every model call the optimizer makes (trajectory generation,
+// judging and prompt reflection), across all runs in this process
+export const limitModelCall = createConcurrencyLimiter(OPTIMIZE_CONCURRENCY);
+
+/**
+ * Map over items with at most `limit` promises in flight at once.
+ * Results keep the order of the input items.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: readonly T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+  const results: R[] = new Array(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+
+  const workers = Array.from(
+    { length: Math.min(Math.max(1, limit), items.length) },
+    worker
+  );
+  await Promise.all(workers);
+
+  return results;
+}
+
+/**
+ * Token bucket limiter allowing `requestsPerMinute` calls per minute, with
+ * bursts up to the same size. Each call to the returned function reserves a
+ * token and resolves once that token is available.
+ */
+export function createRateLimiter(
+  requestsPerMinute: number
+): () => Promise<void> {
+  const capacity = Math.max(1, requestsPerMinute);
+  const tokensPerMs = capacity / 60_000;
+  let tokens = capacity;
+  // Monotonic clock: wall-clock jumps (e.g. NTP steps) must not drain or
+  // refill the bucket
+  let lastRefill = performance.now();
+
+  return async () => {
+    const now = performance.now();
+    tokens = Math.min(capacity, tokens + (now - lastRefill) * tokensPerMs);
+    lastRefill = now;
+
+    // Reserve a token; a negative balance queues callers in arrival order
+    tokens -= 1;
+    if (tokens < 0) {
+      const waitMs = -tokens / tokensPerMs;
+      await new Promise((resolve) => setTimeout(resolve, waitMs));
+    }
+  };
+}
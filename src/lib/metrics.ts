@@ -1,6 +1,10 @@
 import { generateObject } from "ai";
+import { createHash } from "crypto";
+import { promises as fs } from "fs";
+import * as path from "path";
 import { z } from "zod";
-import { loadUserConfig } from "./config-loader";
+import { createRateLimiter, limitModelCall } from "./concurrency";
+import { getDataDirectory, loadUserConfig } from "./config-loader";
 
 // Type definitions for trajectories/samples
 export interface Message {
@@ -84,10 +88,7 @@ export const ReflectionScoreSchema = z.object({
 
 export type ReflectionScore = z.infer<typeof ReflectionScoreSchema>;
 
-/**
- * Load metrics prompts configuration from JSON file
- */
-async function loadMetricsPrompts(): Promise<{
+interface MetricsPromptConfig {
   evaluation_instructions: string;
   dimensions: Record<
     string,
@@ -97,14 +98,71 @@ async function loadMetricsPrompts(): Promise<{
   negative_feedback_instruction: string;
   comparison_positive: string;
   comparison_negative: string;
-}> {
+}
+
+// Defaults used when the config doesn't have a metrics prompt
+const DEFAULT_METRICS_PROMPTS: MetricsPromptConfig = {
+  evaluation_instructions:
+    "You are an expert AI evaluator. Evaluate the generated agent trajectory.",
+  dimensions: {
+    tone: {
+      name: "Tone",
+      description:
+        "Does it match the desired communication style? Consider the user feedback about tone.",
+      weight: 1.0,
+    },
+    accuracy: {
+      name: "Accuracy",
+      description: "Is the information correct and helpful?",
+      weight: 1.0,
+    },
+    efficiency: {
+      name: "Efficiency",
+      description:
+        "Count the number of assistant turns and tool calls. Lower score for unnecessary tool calls or extra turns.",
+      weight: 1.0,
+    },
+    tool_accuracy: {
+      name: "Tool Accuracy",
+      description: "Were the right tools used appropriately?",
+      weight: 1.0,
+    },
+    guardrails: {
+      name: "Guardrails",
+      description: "Does it follow safety guidelines and constraints?",
+      weight: 1.0,
+    },
+  },
+  positive_feedback_instruction:
+    "This is a POSITIVE example (user approved this response).\\nYour task: Compare the generated trajectory to the gold trajectory.\\nThe generated response should match or exceed the quality of the gold trajectory.",
+  negative_feedback_instruction:
+    "This is a NEGATIVE example (user rejected this response).\\nYour task: Evaluate the generated trajectory in isolation.\\nThe generated response should AVOID the issues mentioned in the user feedback.",
+  comparison_positive:
+    "Compare the generated trajectory to the gold trajectory. It should be at least as good.",
+  comparison_negative:
+    "Check if the generated trajectory avoids the issues mentioned in the negative feedback.",
+};
+
+// Metrics prompts resolved per loaded user config; a config reload produces a
+// new config object, so stale entries are never hit
+const metricsPromptsCache = new WeakMap<object, MetricsPromptConfig>();
+
+/**
+ * Load metrics prompts configuration from JSON file
+ */
+async function loadMetricsPrompts(): Promise<MetricsPromptConfig> {
   try {
     // Load from config first
     const config = await loadUserConfig();
 
+    const cached = metricsPromptsCache.get(config);
+    if (cached) {
+      return cached;
+    }
+
     if (config.metricsPrompt) {
       // Use config values, fill in defaults for missing fields
-      return {
+      const metricsPrompts: MetricsPromptConfig = {
         evaluation_instructions:
           config.metricsPrompt.evaluation_instructions ||
           "You are an expert AI evaluator. Evaluate the generated agent trajectory.",
@@ -122,65 +180,17 @@ async function loadMetricsPrompts(): Promise<{
           config.metricsPrompt.comparison_negative ||
           "Check if the generated trajectory avoids the issues mentioned in the negative feedback.",
       };
+      metricsPromptsCache.set(config, metricsPrompts);
+      return metricsPrompts;
     }
   } catch (error) {
     console.error("[Metrics] Failed to load metrics from config:", error);
   }
 
-  // Return defaults if config doesn't have metrics prompt
-  return {
-    evaluation_instructions:
-      "You are an expert AI evaluator. Evaluate the generated agent trajectory.",
-    dimensions: {
-      tone: {
-        name: "Tone",
-        description:
-          "Does it match the desired communication style? Consider the user feedback about tone.",
-        weight: 1.0,
-      },
-      accuracy: {
-        name: "Accuracy",
-        description: "Is the information correct and helpful?",
-        weight: 1.0,
-      },
-      efficiency: {
-        name: "Efficiency",
-        description:
-          "Count the number of assistant turns and tool calls. Lower score for unnecessary tool calls or extra turns.",
-        weight: 1.0,
-      },
-      tool_accuracy: {
-        name: "Tool Accuracy",
-        description: "Were the right tools used appropriately?",
-        weight: 1.0,
-      },
-      guardrails: {
-        name: "Guardrails",
-        description: "Does it follow safety guidelines and constraints?",
-        weight: 1.0,
-      },
-    },
-    positive_feedback_instruction:
-      "This is a POSITIVE example (user approved this response).\\nYour task: Compare the generated trajectory to the gold trajectory.\\nThe generated response should match or exceed the quality of the gold trajectory.",
-    negative_feedback_instruction:
-      "This is a NEGATIVE example (user rejected this response).\\nYour task: Evaluate the generated trajectory in isolation.\\nThe generated response should AVOID the issues mentioned in the user feedback.",
-    comparison_positive:
-      "Compare the generated trajectory to the gold trajectory. It should be at least as good.",
-    comparison_negative:
-      "Check if the generated trajectory avoids the issues mentioned in the negative feedback.",
-  };
+  return DEFAULT_METRICS_PROMPTS;
 }
 
-/**
- * Judge and score a sample using the reflection model
- * This is the core evaluation function for the redesigned GEPA algorithm
- */
-export async function judgeAndScoreSample(
-  sample: Trajectory,
-  generatedTrajectory: Trajectory,
-  reflectionModel: string,
-  selectedMetrics: readonly string[]
-): Promise<{
+export interface JudgeResult {
   metrics: {
     tone?: number;
     accuracy?: number;
@@ -192,33 +202,72 @@ export async function judgeAndScoreSample(
   overallScore: number;
   detailedFeedback: string;
   suggestedImprovements: string;
-}> {
-  // Load metrics prompts configuration
-  const config = await loadMetricsPrompts();
+}
+
+// Number of (sample, generated) pairs marshaled into a single judge call
+export const JUDGE_BATCH_SIZE = 8;
+
+// Client-side cap on judge requests per minute, so bursts of concurrent
+// evaluations stay under the gateway's rate limit instead of retrying on 429s
+const acquireJudgeSlot = createRateLimiter(
+  Number(process.env.JUDGE_RPM) || 500
+);
+
+// Optional judge overrides: a separate (e.g. smaller, cheaper) model for
+// scoring instead of the reflection model, and the number of judge samples
+// per evaluation whose median scores are used (self-consistency)
+const JUDGE_MODEL = process.env.JUDGE_MODEL || undefined;
+const JUDGE_SAMPLES = Math.max(
+  1,
+  Math.floor(Number(process.env.JUDGE_SAMPLES)) || 1
+);
+
+// A single judge sample is decoded greedily so its cached score is
+// reproducible. With several samples the provider default temperature is
+// kept, otherwise every sample would be the same and the median pointless.
+const JUDGE_TEMPERATURE = JUDGE_SAMPLES === 1 ? 0 : undefined;
+
+const BatchReflectionScoreSchema = z.object({
+  results: z.array(
+    ReflectionScoreSchema.extend({
+      index: z
+        .number()
+        .int()
+        .describe("Number of the pair being scored, as given in the prompt"),
+    })
+  ),
+});
+
+// Sample-specific parts of a pair section (everything except the generated
+// trajectory), rendered once per loaded sample and metrics prompt config
+// rather than on every judge call. Trajectories are serialized compactly
+// since indentation only adds tokens to the judge prompt.
+const sampleSectionCache = new WeakMap<
+  Trajectory,
+  { config: MetricsPromptConfig; head: string; tail: string }
+>();
+
+function renderSampleSection(
+  config: MetricsPromptConfig,
+  sample: Trajectory
+): { head: string; tail: string } {
+  const cached = sampleSectionCache.get(sample);
+  if (cached && cached.config === config) {
+    return cached;
+  }
 
   const isPositiveFeedback = sample.feedback?.rating === "positive";
   const feedbackComment = sample.feedback?.comment || "No feedback provided";
 
-  // Build judgment prompt using config
   const comparisonContext = isPositiveFeedback
     ? config.positive_feedback_instruction
     : config.negative_feedback_instruction;
 
-  // Build dimension descriptions from config
-  const dimensionDescriptions = Object.entries(config.dimensions)
-    .map(
-      ([_key, dim], index) =>
-        `${index + 1}. **${dim.name}**: ${dim.description}`
-    )
-    .join("\n");
-
   const comparisonInstruction = isPositiveFeedback
     ? config.comparison_positive
     : config.comparison_negative;
 
-  const judgmentPrompt = `${config.evaluation_instructions}
-
-CONTEXT:
+  const head = `CONTEXT:
 ${comparisonContext}
 
 USER FEEDBACK: "${feedbackComment}"
@@ -227,59 +276,498 @@ Feedback Type: ${
   }
 
 SAMPLE TRAJECTORY (Reference):
-${JSON.stringify(sample.messages, null, 2)}
+${JSON.stringify(sample.messages)}
 
 GENERATED TRAJECTORY (To Evaluate):
-${JSON.stringify(generatedTrajectory.messages, null, 2)}
+`;
+  const tail = `
+
+${comparisonInstruction}`;
+
+  sampleSectionCache.set(sample, { config, head, tail });
+  return { head, tail };
+}
+
+// Build the per-pair context: feedback, reference and generated trajectories
+function buildPairSection(
+  config: MetricsPromptConfig,
+  sample: Trajectory,
+  generatedTrajectory: Trajectory
+): string {
+  const { head, tail } = renderSampleSection(config, sample);
+  return head + JSON.stringify(generatedTrajectory.messages) + tail;
+}
+
+const dimensionDescriptionsCache = new WeakMap<MetricsPromptConfig, string>();
+
+function buildDimensionDescriptions(config: MetricsPromptConfig): string {
+  let descriptions = dimensionDescriptionsCache.get(config);
+  if (descriptions === undefined) {
+    descriptions = Object.entries(config.dimensions)
+      .map(
+        ([_key, dim], index) =>
+          `${index + 1}. **${dim.name}**: ${dim.description}`
+      )
+      .join("\n");
+    dimensionDescriptionsCache.set(config, descriptions);
+  }
+  return descriptions;
+}
+
+function toJudgeResult(score: ReflectionScore): JudgeResult {
+  return {
+    metrics: {
+      tone: score.tone,
+      accuracy: score.accuracy,
+      efficiency: score.efficiency,
+      tool_accuracy: score.tool_accuracy,
+      guardrails: score.guardrails,
+    },
+    overallScore: score.overall_score,
+    detailedFeedback: score.detailed_feedback,
+    suggestedImprovements: score.suggested_improvements,
+  };
+}
+
+function median(values: number[]): number {
+  const sorted = [...values].sort((a, b) => a - b);
+  const mid = Math.floor(sorted.length / 2);
+  return sorted.length % 2 === 0
+    ? (sorted[mid - 1] + sorted[mid]) / 2
+    : sorted[mid];
+}
+
+// Combine several judge samples for the same pair: median of each score,
+// longest feedback and suggestions
+function combineJudgeResults(results: JudgeResult[]): JudgeResult {
+  if (results.length === 1) {
+    return results[0];
+  }
+
+  const metrics: JudgeResult["metrics"] = {};
+  for (const key of Object.keys(results[0].metrics)) {
+    const values = results
+      .map((r) => r.metrics[key])
+      .filter((v) => v !== undefined) as number[];
+    if (values.length > 0) {
+      metrics[key] = median(values);
+    }
+  }
+
+  const longest = (texts: string[]) =>
+    texts.reduce((best, text) => (text.length > best.length ? text : best));
+
+  return {
+    metrics,
+    overallScore: median(results.map((r) => r.overallScore)),
+    detailedFeedback: longest(results.map((r) => r.detailedFeedback)),
+    suggestedImprovements: longest(results.map((r) => r.suggestedImprovements)),
+  };
+}
+
+// Issue JUDGE_SAMPLES judge calls in parallel and return the successful
+// responses; throws only if every call failed. Callers should only cache a
+// result built from all JUDGE_SAMPLES responses.
+async function sampleJudge<T>(call: () => Promise<T>): Promise<T[]> {
+  const settled = await Promise.allSettled(
+    Array.from({ length: JUDGE_SAMPLES }, async () => {
+      await acquireJudgeSlot();
+      return limitModelCall(call);
+    })
+  );
+
+  const responses: T[] = [];
+  for (const r of settled) {
+    if (r.status === "fulfilled") {
+      responses.push(r.value);
+    } else {
+      console.error("[Judge] Judge sample failed:", r.reason);
+    }
+  }
+  if (responses.length === 0) {
+    throw (settled[0] as PromiseRejectedResult).reason;
+  }
+  return responses;
+}
+
+// Instructions shared by every judge call of a run. They go in the system
+// message, ahead of the per-pair content, so providers with prompt caching
+// can reuse the prefix across calls.
+const judgeSystemPromptCache = new WeakMap<
+  MetricsPromptConfig,
+  Map<string, string>
+>();
+
+function buildJudgeSystemPrompt(
+  config: MetricsPromptConfig,
+  selectedMetrics: readonly string[],
+  batched: boolean
+): string {
+  let prompts = judgeSystemPromptCache.get(config);
+  if (!prompts) {
+    prompts = new Map();
+    judgeSystemPromptCache.set(config, prompts);
+  }
+  const key = `${selectedMetrics.join(",")}|${batched}`;
+  const cached = prompts.get(key);
+  if (cached !== undefined) {
+    return cached;
+  }
+
+  const task = batched
+    ? `You will evaluate several independent pairs. Each pair has its own context, user feedback, reference trajectory and generated trajectory. Judge every pair on its own merits.
 
 EVALUATION DIMENSIONS:
 ${selectedMetrics.map((m) => `- ${m}`).join("\n")}
 
+Evaluate each generated trajectory across ALL 5 dimensions:
+${buildDimensionDescriptions(config)}
+
+Return exactly one result per pair, with "index" set to the pair number.`
+    : `EVALUATION DIMENSIONS:
+${selectedMetrics.map((m) => `- ${m}`).join("\n")}
+
 Evaluate the generated trajectory across ALL 5 dimensions:
-${dimensionDescriptions}
+${buildDimensionDescriptions(config)}`;
 
-${comparisonInstruction}
+  const systemPrompt = `${config.evaluation_instructions}
+
+${task}
 
 Provide scores (0-1), detailed feedback, and specific improvement suggestions for the prompt.`;
+  prompts.set(key, systemPrompt);
+  return systemPrompt;
+}
+
+function neutralJudgeResult(error: unknown): JudgeResult {
+  return {
+    metrics: {
+      tone: 0.5,
+      accuracy: 0.5,
+      efficiency: 0.5,
+      tool_accuracy: 0.5,
+      guardrails: 0.5,
+    },
+    overallScore: 0.5,
+    detailedFeedback: `Evaluation failed: ${
+      error instanceof Error ? error.message : "Unknown error"
+    }`,
+    suggestedImprovements:
+      "Unable to generate suggestions due to evaluation error.",
+  };
+}
+
+// LRU of judge results. The judge prompt is fully determined by the cache
+// key, so identical re-evaluations skip the reflection model call. Entries
+// are persisted to judge-cache.json so they survive server restarts.
+const JUDGE_CACHE_MAX_ENTRIES = 4096;
+const JUDGE_CACHE_FLUSH_MS = 5000;
+const judgeCache = new Map<string, JudgeResult>();
+let judgeCacheLoaded: Promise<void> | null = null;
+let judgeCacheFlushTimer: ReturnType<typeof setTimeout> | null = null;
+let judgeCacheWrite: Promise<void> = Promise.resolve();
 
+function getJudgeCachePath(): string {
+  return path.join(getDataDirectory(), "judge-cache.json");
+}
+
+function judgeCacheKey(
+  config: MetricsPromptConfig,
+  reflectionModel: string,
+  selectedMetrics: readonly string[],
+  pairSection: string
+): string {
+  // JUDGE_SAMPLES is part of the key: a median of k samples must not be
+  // served from an entry judged with fewer samples
+  return createHash("sha256")
+    .update(reflectionModel)
+    .update("\0")
+    .update(String(JUDGE_SAMPLES))
+    .update("\0")
+    .update(selectedMetrics.join(","))
+    .update("\0")
+    .update(config.evaluation_instructions)
+    .update("\0")
+    .update(buildDimensionDescriptions(config))
+    .update("\0")
+    .update(pairSection)
+    .digest("hex");
+}
+
+// Shape of judge-cache.json, validated once on load so cached results can be
+// used without further checks (e.g. a file left by an older version)
+const PersistedJudgeCacheSchema = z.object({
+  entries: z.array(
+    z.tuple([
+      z.string(),
+      z.object({
+        metrics: z.record(z.string(), z.number()),
+        overallScore: z.number(),
+        detailedFeedback: z.string(),
+        suggestedImprovements: z.string(),
+      }),
+    ])
+  ),
+});
+
+function trimJudgeCache(): void {
+  while (judgeCache.size > JUDGE_CACHE_MAX_ENTRIES) {
+    const oldestKey = judgeCache.keys().next().value;
+    if (oldestKey === undefined) {
+      break;
+    }
+    judgeCache.delete(oldestKey);
+  }
+}
+
+// Load judge results persisted by earlier runs (once per process)
+function loadJudgeCache(): Promise<void> {
+  if (!judgeCacheLoaded) {
+    judgeCacheLoaded = (async () => {
+      try {
+        const data = await fs.readFile(getJudgeCachePath(), "utf-8");
+        const parsed = PersistedJudgeCacheSchema.safeParse(JSON.parse(data));
+        if (!parsed.success) {
+          console.warn("[Judge] Ignoring invalid judge cache file");
+          return;
+        }
+        for (const [key, result] of parsed.data.entries) {
+          if (!judgeCache.has(key)) {
+            judgeCache.set(key, result);
+          }
+        }
+        trimJudgeCache();
+      } catch (error) {
+        if ((error as NodeJS.ErrnoException).code !== "ENOENT") {
+          console.warn("[Judge] Could not load judge cache:", error);
+        }
+      }
+    })();
+  }
+  return judgeCacheLoaded;
+}
+
+// Write the cache to a temp file and rename it into place, so a crash
+// mid-write never leaves a truncated judge-cache.json behind
+async function writeJudgeCache(): Promise<void> {
+  const cachePath = getJudgeCachePath();
+  const tempPath = `${cachePath}.${process.pid}.tmp`;
   try {
-    const result = await generateObject({
-      model: reflectionModel,
-      schema: ReflectionScoreSchema,
-      prompt: judgmentPrompt,
+    await fs.writeFile(tempPath, JSON.stringify({ entries: [...judgeCache] }));
+    await fs.rename(tempPath, cachePath);
+  } catch (error) {
+    console.error("[Judge] Error saving judge cache:", error);
+  }
+}
+
+// Batch cache writes: results added within JUDGE_CACHE_FLUSH_MS share one
+// write, and writes never overlap
+function scheduleJudgeCacheWrite(): void {
+  if (judgeCacheFlushTimer) {
+    return;
+  }
+  judgeCacheFlushTimer = setTimeout(() => {
+    judgeCacheFlushTimer = null;
+    judgeCacheWrite = judgeCacheWrite.then(writeJudgeCache);
+  }, JUDGE_CACHE_FLUSH_MS);
+  // A pending flush should not keep the process alive
+  judgeCacheFlushTimer.unref?.();
+}
+
+function getCachedJudgeResult(key: string): JudgeResult | undefined {
+  const cached = judgeCache.get(key);
+  if (cached) {
+    // Move to the most recently used position
+    judgeCache.delete(key);
+    judgeCache.set(key, cached);
+  }
+  return cached;
+}
+
+function setCachedJudgeResult(key: string, result: JudgeResult): void {
+  judgeCache.delete(key);
+  judgeCache.set(key, result);
+  trimJudgeCache();
+
+  scheduleJudgeCacheWrite();
+}
+
+// Clear cached judge results (e.g. after changing the judge setup)
+export async function clearJudgeCache(): Promise<void> {
+  // Let an in-flight load finish so it cannot repopulate the cleared cache
+  await judgeCacheLoaded;
+  if (judgeCacheFlushTimer) {
+    clearTimeout(judgeCacheFlushTimer);
+    judgeCacheFlushTimer = null;
+  }
+  await judgeCacheWrite;
+  judgeCache.clear();
+  judgeCacheLoaded = Promise.resolve();
+  await fs.rm(getJudgeCachePath(), { force: true });
+}
+
+/**
+ * Judge and score a sample using the reflection model
+ * This is the core evaluation function for the redesigned GEPA algorithm
+ */
+export async function judgeAndScoreSample(
+  sample: Trajectory,
+  generatedTrajectory: Trajectory,
+  reflectionModel: string,
+  selectedMetrics: readonly string[]
+): Promise<JudgeResult> {
+  // Load metrics prompts configuration
+  const config = await loadMetricsPrompts();
+  await loadJudgeCache();
+
+  const judgeModel = JUDGE_MODEL || reflectionModel;
+  const pairSection = buildPairSection(config, sample, generatedTrajectory);
+  const cacheKey = judgeCacheKey(
+    config,
+    judgeModel,
+    selectedMetrics,
+    pairSection
+  );
+  const cached = getCachedJudgeResult(cacheKey);
+  if (cached) {
+    return cached;
+  }
+
+  const system = buildJudgeSystemPrompt(config, selectedMetrics, false);
+
+  try {
+    const responses = await sampleJudge(async () => {
+      const result = await generateObject({
+        model: judgeModel,
+        schema: ReflectionScoreSchema,
+        system,
+        prompt: pairSection,
+        temperature: JUDGE_TEMPERATURE,
+      });
+      return toJudgeResult(result.object);
     });
 
-    const score = result.object;
-
-    return {
-      metrics: {
-        tone: score.tone,
-        accuracy: score.accuracy,
-        efficiency: score.efficiency,
-        tool_accuracy: score.tool_accuracy,
-        guardrails: score.guardrails,
-      },
-      overallScore: score.overall_score,
-      detailedFeedback: score.detailed_feedback,
-      suggestedImprovements: score.suggested_improvements,
-    };
+    const judged = combineJudgeResults(responses);
+    if (responses.length === JUDGE_SAMPLES) {
+      setCachedJudgeResult(cacheKey, judged);
+    }
+    return judged;
   } catch (error) {
     console.error("[Judge] Error evaluating sample:", error);
     // Return neutral scores on error
-    return {
-      metrics: {
-        tone: 0.5,
-        accuracy: 0.5,
-        efficiency: 0.5,
-        tool_accuracy: 0.5,
-        guardrails: 0.5,
-      },
-      overallScore: 0.5,
-      detailedFeedback: `Evaluation failed: ${
-        error instanceof Error ? error.message : "Unknown error"
-      }`,
-      suggestedImprovements:
-        "Unable to generate suggestions due to evaluation error.",
-    };
+    return neutralJudgeResult(error);
+  }
+}
+
+// A batch response is only usable if it scores every pair number 1..count
+// exactly once; anything else (e.g. pairs numbered from 0) would attach scores
+// to the wrong trajectories
+function hasExactPairIndices(
+  results: ReadonlyArray<{ index: number }>,
+  count: number
+): boolean {
+  if (results.length !== count) {
+    return false;
   }
+  const indices = new Set(results.map((r) => r.index));
+  return (
+    indices.size === count &&
+    results.every((r) => r.index >= 1 && r.index <= count)
+  );
+}
+
+/**
+ * Judge several (sample, generated trajectory) pairs with a single call to the
+ * reflection model. Pairs are numbered in the prompt and the results are
+ * matched back by index. If the judge does not return every pair number
+ * exactly once, the batch is discarded and each pair is re-scored on its own.
+ */
+export async function judgeAndScoreBatch(
+  pairs: Array<{ sample: Trajectory; generatedTrajectory: Trajectory }>,
+  reflectionModel: string,
+  selectedMetrics: readonly string[]
+): Promise<JudgeResult[]> {
+  if (pairs.length === 0) {
+    return [];
+  }
+
+  const config = await loadMetricsPrompts();
+  await loadJudgeCache();
+
+  const judgeModel = JUDGE_MODEL || reflectionModel;
+  const pairSections = pairs.map(({ sample, generatedTrajectory }) =>
+    buildPairSection(config, sample, generatedTrajectory)
+  );
+  const cacheKeys = pairSections.map((pairSection) =>
+    judgeCacheKey(config, judgeModel, selectedMetrics, pairSection)
+  );
+  const results = cacheKeys.map((key) => getCachedJudgeResult(key));
+
+  // Only pairs without a cached result go to the reflection model
+  const pending = results.flatMap((result, i) => (result ? [] : [i]));
+
+  if (pending.length > 1) {
+    const system = buildJudgeSystemPrompt(config, selectedMetrics, true);
+    const prompt = `There are ${pending.length} pairs (1-${pending.length}).
+
+${pending
+  .map((i, n) => `=== PAIR ${n + 1} ===\n${pairSections[i]}`)
+  .join("\n\n")}`;
+
+    try {
+      const responses = await sampleJudge(async () => {
+        const result = await generateObject({
+          model: judgeModel,
+          schema: BatchReflectionScoreSchema,
+          system,
+          prompt,
+          temperature: JUDGE_TEMPERATURE,
+        });
+        if (!hasExactPairIndices(result.object.results, pending.length)) {
+          throw new Error(
+            `Judge returned pair indices [${result.object.results
+              .map((r) => r.index)
+              .join(", ")}], expected 1-${pending.length} exactly once`
+          );
+        }
+        return result.object.results;
+      });
+
+      // Collect each pair's result from every judge sample
+      const judgedByPair = new Map<number, JudgeResult[]>();
+      for (const response of responses) {
+        for (const { index, ...score } of response) {
+          const i = pending[index - 1];
+          judgedByPair.set(i, [
+            ...(judgedByPair.get(i) ?? []),
+            toJudgeResult(score),
+          ]);
+        }
+      }
+
+      for (const [i, judged] of judgedByPair) {
+        const combined = combineJudgeResults(judged);
+        results[i] = combined;
+        if (responses.length === JUDGE_SAMPLES) {
+          setCachedJudgeResult(cacheKeys[i], combined);
+        }
+      }
+    } catch (error) {
+      console.error("[Judge] Error evaluating batch:", error);
+    }
+  }
+
+  // Judge anything still missing (single pair or failed batch) alone
+  return Promise.all(
+    results.map(
+      (result, i) =>
+        result ??
+        judgeAndScoreSample(
+          pairs[i].sample,
+          pairs[i].generatedTrajectory,
+          reflectionModel,
+          selectedMetrics
+        )
+    )
+  );
 }